@@ -0,0 +1,171 @@
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import historico_archivo as ha
+
+# ==========================================================
+# CONFIGURACIÓN -- python bench_historico.py [archivo.csv]
+# ==========================================================
+
+# CSV crudo de referencia (se copia, el original no se modifica)
+CSV_FILENAME = "smart_home_historico.csv"
+
+# Repeticiones de cada lectura; se reporta la mejor
+REPETICIONES = 5
+
+# Casos límite que deben sobrevivir comprimir -> descomprimir sin cambios
+CASOS_IDA_Y_VUELTA = {
+    "día vacío": [],
+    "fila cortada": [
+        ["2025-11-18T19:58:45.600924", "81.0", "0", "22.8", "74.0", "127.5"],
+        ["2025-11-18T19:58:5"],
+        ["2025-11-18T19:58:49.653036", "81.25", "0", "22.8", "74.0", "-1"],
+    ],
+    "fila con columnas de más": [
+        ["2025-11-18T19:58:45.600924", "81.0", "0", "22.8", "74.0", "127.5", "x"],
+    ],
+    "-0.0, nan, inf": [
+        ["2025-11-18T00:00:00", "-0.0", "0", "-0.0", "nan", "inf"],
+        ["2025-11-18T00:00:02", "0", "-0", "0.0", "74.0", "-inf"],
+    ],
+    "más de 3 decimales": [
+        ["2025-11-18T00:00:00.000001", "81.33333333333333", "0", "22.8125", "74.0001", "126.33333333333333"],
+        ["2025-11-18T00:00:02", "1e-05", "1", "22.8", "74.0", "1e+20"],
+    ],
+    "valores fuera de int64": [
+        ["2025-11-18T00:00:00", "1e+20", "0", "1", "1", "-9000000000000000000"],
+        ["2025-11-18T00:00:02", "1", "0", "1", "1", "9000000000000000000"],
+    ],
+    "texto y saltos de línea": [
+        ["2025-11-18 00:00:00", "", "1", "a,b", "x\ny", "\"q\""],
+    ],
+}
+
+# ==========================================================
+# FUNCIONES
+# ==========================================================
+
+def verificar_ida_y_vuelta(filas_reales):
+    """
+    Comprime y descomprime los casos límite y las filas reales.
+    Retorna la lista de casos que no se reproducen exactamente.
+    """
+    casos = dict(CASOS_IDA_Y_VUELTA)
+    casos["CSV real"] = filas_reales
+
+    fallidos = []
+    for nombre, filas in casos.items():
+        try:
+            if ha.descomprimir_filas(ha.comprimir_filas(filas))[1] != filas:
+                fallidos.append(nombre)
+        except Exception as e:
+            fallidos.append(f"{nombre} ({e})")
+    return fallidos
+
+
+def medir(funcion):
+    """
+    Ejecuta la función varias veces y retorna (mejor tiempo, resultado)
+    """
+    mejor = None
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        duracion = time.perf_counter() - inicio
+        if mejor is None or duracion < mejor:
+            mejor = duracion
+    return mejor, resultado
+
+
+def escanear_csv(filename):
+    """
+    Recorre el CSV crudo y suma temp como trabajo mínimo por fila
+    """
+    filas = 0
+    total = 0.0
+    with open(filename, "r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for fila in reader:
+            filas += 1
+            total += float(fila[3])
+    return filas, total
+
+
+def escanear_historico(directorio, csv_vivo):
+    filas = 0
+    total = 0.0
+    for fila in ha.iterar_historico(csv_vivo=csv_vivo, directorio=directorio):
+        filas += 1
+        total += float(fila[3])
+    return filas, total
+
+# ==========================================================
+# MAIN
+# ==========================================================
+
+def main():
+    origen = sys.argv[1] if len(sys.argv) > 1 else CSV_FILENAME
+
+    print("\n" + "="*50)
+    print("     BENCHMARK: CSV CRUDO VS ARCHIVO COMPRIMIDO")
+    print("="*50 + "\n")
+
+    tmp = tempfile.mkdtemp()
+    try:
+        csv_crudo = os.path.join(tmp, "crudo.csv")
+        csv_vivo = os.path.join(tmp, "vivo.csv")
+        directorio = os.path.join(tmp, "historico")
+        shutil.copy(origen, csv_crudo)
+        shutil.copy(origen, csv_vivo)
+
+        with open(csv_crudo, "r", newline="", encoding="utf-8") as f:
+            filas_reales = [fila for fila in csv.reader(f) if fila][1:]
+
+        fallidos = verificar_ida_y_vuelta(filas_reales)
+        if fallidos:
+            print(f" ERROR: ida y vuelta falla en: {', '.join(fallidos)}")
+            return
+        print(f" Ida y vuelta OK ({len(CASOS_IDA_Y_VUELTA) + 1} casos)")
+
+        # Archivar todos los días (hoy = un día que no está en el CSV)
+        inicio = time.perf_counter()
+        dias = ha.rotar_historico(csv_vivo, directorio, hoy="9999-12-31")
+        t_rotar = time.perf_counter() - inicio
+
+        tam_csv = os.path.getsize(csv_crudo)
+        tam_archivo = sum(os.path.getsize(ha.ruta_archivo(dia, directorio)) for dia in dias)
+
+        t_csv, res_csv = medir(lambda: escanear_csv(csv_crudo))
+        t_arch, res_arch = medir(lambda: escanear_historico(directorio, csv_vivo))
+
+        if res_csv != res_arch:
+            print(f" ERROR: resultados distintos {res_csv} != {res_arch}")
+            return
+
+        # La serie continua debe ser idéntica al CSV, fila por fila
+        if list(ha.iterar_historico(csv_vivo=csv_vivo, directorio=directorio)) != filas_reales:
+            print(" ERROR: iterar_historico no reproduce el CSV original")
+            return
+
+        filas = res_csv[0]
+        print(f" Filas: {filas} en {len(dias)} día(s)")
+        print(f" Compresión: {t_rotar:.3f} s")
+        print()
+        print(f" {'':12}{'bytes':>12}{'scan (s)':>12}{'filas/s':>14}{'MB/s':>10}")
+        for nombre, tam, t in (("CSV crudo", tam_csv, t_csv), ("Archivo", tam_archivo, t_arch)):
+            print(f" {nombre:12}{tam:>12}{t:>12.4f}{filas / t:>14.0f}{tam_csv / t / 1e6:>10.1f}")
+        print()
+        print(f" Reducción de tamaño: {tam_csv / tam_archivo:.1f}x")
+        print(f" Velocidad de lectura relativa: {t_csv / t_arch:.2f}x")
+        print("   (MB/s se calcula sobre el tamaño del CSV crudo en ambos casos)")
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
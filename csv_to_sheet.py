@@ -1,13 +1,15 @@
-import csv
+import os
 import gspread
 from google.oauth2.service_account import Credentials
+from historico_archivo import CABECERA, dias_archivados, iterar_historico
 
 # ==========================================================
 # CONFIGURACIÓN-- python csv_to_sheet.py 
 # ==========================================================
 
-# Archivo CSV local
+# Archivo CSV local (día en curso) y carpeta con los días archivados
 CSV_FILENAME = "smart_home_historico.csv"
+ARCHIVO_DIR = "historico"
 
 # Nombre del archivo de credenciales JSON de Google
 CREDENTIALS_FILE = "credentials.json"
@@ -66,15 +68,16 @@ def obtener_spreadsheet(client, nombre):
 
 def leer_csv(filename):
     """
-    Lee el archivo CSV y retorna los datos
+    Lee el histórico completo (días archivados + CSV vivo) y retorna los datos
     """
-    print(f"Leyendo datos de {filename}...")
+    print(f"Leyendo datos de {ARCHIVO_DIR}/ y {filename}...")
     
-    datos = []
-    with open(filename, 'r', encoding='utf-8') as file:
-        reader = csv.reader(file)
-        for row in reader:
-            datos.append(row)
+    if not os.path.exists(filename) and not dias_archivados(ARCHIVO_DIR):
+        raise FileNotFoundError(f"No such file: '{filename}'")
+
+    datos = [CABECERA]
+    for row in iterar_historico(csv_vivo=filename, directorio=ARCHIVO_DIR):
+        datos.append(row)
     
     print(f" {len(datos)} filas leídas")
     return datos
@@ -0,0 +1,503 @@
+import csv
+import io
+import json
+import lzma
+import os
+import sys
+from array import array
+from contextlib import nullcontext
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+
+# ==========================================================
+# CONFIGURACIÓN -- python historico_archivo.py
+# ==========================================================
+
+# CSV "vivo": solo contiene los registros del día en curso
+CSV_FILENAME = "smart_home_historico.csv"
+
+# Carpeta con los días cerrados ya comprimidos (un archivo por día)
+ARCHIVO_DIR = "historico"
+ARCHIVO_EXT = ".shz"
+
+CABECERA = ["datetime", "sound_avg", "motion", "temp", "hum", "dist"]
+
+# Firma del formato comprimido por columnas
+MAGIC = b"SHZ1"
+
+# Máximo de decimales que se intentan guardar como entero (punto fijo)
+MAX_DECIMALES = 3
+
+# ==========================================================
+# CODIFICACIÓN POR COLUMNAS
+# ==========================================================
+#
+# Cada día cerrado se guarda por columnas. Según el contenido se usa:
+#   "ts"   -> datetime ISO pasado a microsegundos, guardado como deltas
+#   "fijo" -> número con N decimales pasado a entero, guardado como deltas
+#   "txt"  -> texto tal cual (una línea por valor)
+# Después todo el bloque se comprime con LZMA (preset por defecto: con
+# datos tan repetitivos PRESET_EXTREME casi no reduce más y tarda mucho). Las columnas que cambian
+# lento (datetime cada ~2 s, temp, hum) quedan casi todas en deltas
+# repetidos, que LZMA comprime muy bien.
+#
+# La codificación es sin pérdida: solo se elige "ts" o "fijo" si al
+# reconstruir cada valor se obtiene exactamente el mismo texto del CSV.
+# Si alguna fila no tiene todas las columnas (p. ej. una línea cortada al
+# matar el logger) o algún valor trae saltos de línea, el día completo se
+# guarda como CSV crudo comprimido ("modo": "csv").
+
+EPOCA = datetime(1970, 1, 1)
+
+
+def _a_bytes(enteros):
+    """
+    Convierte una lista de enteros de 64 bits a bytes little-endian.
+    Retorna None si algún valor no cabe en 64 bits.
+    """
+    try:
+        datos = array("q", enteros)
+    except OverflowError:
+        return None
+    if sys.byteorder == "big":
+        datos.byteswap()
+    return datos.tobytes()
+
+
+def _de_bytes(blob):
+    datos = array("q")
+    datos.frombytes(blob)
+    if sys.byteorder == "big":
+        datos.byteswap()
+    return datos
+
+
+def _deltas(enteros):
+    previo = 0
+    salida = []
+    for valor in enteros:
+        salida.append(valor - previo)
+        previo = valor
+    return salida
+
+
+def _textos_ts(enteros):
+    """
+    Reconstruye los datetime ISO. Equivale a isoformat() por valor, pero
+    el prefijo de la fecha se calcula una sola vez por día.
+    """
+    prefijos = {}
+    textos = []
+    for micros in enteros:
+        dias, resto = divmod(micros, 86400000000)
+        segundos, us = divmod(resto, 1000000)
+        prefijo = prefijos.get(dias)
+        if prefijo is None:
+            prefijo = (EPOCA + timedelta(days=dias)).date().isoformat()
+            prefijos[dias] = prefijo
+        hh, resto = divmod(segundos, 3600)
+        mm, ss = divmod(resto, 60)
+        if us:
+            textos.append(f"{prefijo}T{hh:02d}:{mm:02d}:{ss:02d}.{us:06d}")
+        else:
+            textos.append(f"{prefijo}T{hh:02d}:{mm:02d}:{ss:02d}")
+    return textos
+
+
+def _codificar_ts(valores):
+    micros = []
+    for texto in valores:
+        try:
+            dt = datetime.fromisoformat(texto)
+        except ValueError:
+            return None
+        if dt.tzinfo is not None or dt.isoformat() != texto:
+            return None
+        micros.append((dt - EPOCA) // timedelta(microseconds=1))
+    return _a_bytes(_deltas(micros))
+
+
+def _texto_fijo(entero, decimales):
+    if decimales == 0:
+        return str(entero)
+    return repr(entero / 10 ** decimales)
+
+
+def _textos_fijo(enteros, decimales):
+    # temp / hum repiten pocos valores: se formatea cada uno una sola vez
+    cache = {}
+    textos = []
+    for entero in enteros:
+        texto = cache.get(entero)
+        if texto is None:
+            texto = _texto_fijo(entero, decimales)
+            cache[entero] = texto
+        textos.append(texto)
+    return textos
+
+
+def _codificar_fijo(valores, decimales):
+    escala = 10 ** decimales
+    enteros = []
+    for texto in valores:
+        try:
+            entero = round(float(texto) * escala) if decimales else int(texto)
+        except (ValueError, OverflowError):
+            return None
+        if _texto_fijo(entero, decimales) != texto:
+            return None
+        enteros.append(entero)
+    return _a_bytes(_deltas(enteros))
+
+
+def _codificar_columna(valores):
+    """
+    Elige la codificación más compacta que reproduce el texto exacto.
+    Retorna (tipo, decimales, blob)
+    """
+    blob = _codificar_ts(valores)
+    if blob is not None:
+        return "ts", 0, blob
+
+    for decimales in range(MAX_DECIMALES + 1):
+        blob = _codificar_fijo(valores, decimales)
+        if blob is not None:
+            return "fijo", decimales, blob
+
+    return "txt", 0, "\n".join(valores).encode("utf-8")
+
+
+def _decodificar_columna(tipo, decimales, blob, filas):
+    if tipo == "txt":
+        return blob.decode("utf-8").split("\n") if filas else []
+
+    enteros = accumulate(_de_bytes(blob))
+    if tipo == "ts":
+        return _textos_ts(enteros)
+    return _textos_fijo(enteros, decimales)
+
+
+def _es_tabular(filas, cabecera):
+    for fila in filas:
+        if len(fila) != len(cabecera):
+            return False
+        for valor in fila:
+            if "\n" in valor or "\r" in valor:
+                return False
+    return True
+
+
+def _comprimir(meta, cuerpo):
+    cuerpo = json.dumps(meta).encode("utf-8") + b"\n" + cuerpo
+    return MAGIC + lzma.compress(cuerpo)
+
+
+def comprimir_filas(filas, cabecera=CABECERA):
+    """
+    Comprime una lista de filas (listas de strings) al formato por columnas
+    """
+    if not _es_tabular(filas, cabecera):
+        texto = io.StringIO()
+        csv.writer(texto, lineterminator="\n").writerows(filas)
+        meta = {"cabecera": cabecera, "filas": len(filas), "modo": "csv"}
+        return _comprimir(meta, texto.getvalue().encode("utf-8"))
+
+    columnas = [list(col) for col in zip(*filas)] if filas else [[] for _ in cabecera]
+
+    meta = {"cabecera": cabecera, "filas": len(filas), "modo": "columnas", "columnas": []}
+    blobs = []
+    for valores in columnas:
+        tipo, decimales, blob = _codificar_columna(valores)
+        meta["columnas"].append({"tipo": tipo, "decimales": decimales, "bytes": len(blob)})
+        blobs.append(blob)
+
+    return _comprimir(meta, b"".join(blobs))
+
+
+def descomprimir_filas(datos):
+    """
+    Operación inversa de comprimir_filas(). Retorna (cabecera, filas)
+    """
+    if not datos.startswith(MAGIC):
+        raise ValueError("Archivo de histórico con formato desconocido")
+
+    cuerpo = lzma.decompress(datos[len(MAGIC):])
+    fin_meta = cuerpo.index(b"\n")
+    meta = json.loads(cuerpo[:fin_meta])
+
+    if meta.get("modo") == "csv":
+        texto = cuerpo[fin_meta + 1:].decode("utf-8")
+        filas = list(csv.reader(io.StringIO(texto, newline="")))
+    else:
+        filas = _decodificar_columnas(meta, cuerpo, fin_meta + 1)
+
+    if len(filas) != meta["filas"]:
+        raise ValueError("Archivo de histórico corrupto: número de filas no coincide")
+    return meta["cabecera"], filas
+
+
+def _decodificar_columnas(meta, cuerpo, pos):
+    columnas = []
+    for col in meta["columnas"]:
+        blob = cuerpo[pos:pos + col["bytes"]]
+        pos += col["bytes"]
+        columnas.append(_decodificar_columna(col["tipo"], col["decimales"], blob, meta["filas"]))
+
+    return [list(fila) for fila in zip(*columnas)]
+
+# ==========================================================
+# ARCHIVO POR DÍAS
+# ==========================================================
+
+def ruta_archivo(dia, directorio=ARCHIVO_DIR):
+    """
+    dia: string 'YYYY-MM-DD'
+    """
+    return os.path.join(directorio, dia + ARCHIVO_EXT)
+
+
+def _es_dia(texto):
+    try:
+        date.fromisoformat(texto)
+    except ValueError:
+        return False
+    return len(texto) == 10
+
+
+def dia_de_fila(fila):
+    """
+    Día 'YYYY-MM-DD' del datetime de la fila, o None si el datetime no es
+    válido (vacío, línea cortada, dos líneas pegadas, ...)
+    """
+    texto = fila[0] if fila else ""
+    if texto[10:11] != "T" or not _es_dia(texto[:10]):
+        return None
+    return texto[:10]
+
+
+def dias_archivados(directorio=ARCHIVO_DIR):
+    """
+    Lista ordenada de los días que ya están comprimidos
+    """
+    if not os.path.isdir(directorio):
+        return []
+    return sorted(
+        nombre[:-len(ARCHIVO_EXT)]
+        for nombre in os.listdir(directorio)
+        if nombre.endswith(ARCHIVO_EXT) and _es_dia(nombre[:-len(ARCHIVO_EXT)])
+    )
+
+
+def leer_archivo(dia, directorio=ARCHIVO_DIR):
+    with open(ruta_archivo(dia, directorio), "rb") as f:
+        return descomprimir_filas(f.read())[1]
+
+
+def _escribir_archivo(dia, filas, directorio):
+    os.makedirs(directorio, exist_ok=True)
+    ruta = ruta_archivo(dia, directorio)
+    datos = comprimir_filas(filas)
+
+    # Verificar ida y vuelta antes de tocar nada: el CSV vivo se reescribe
+    # después y este archivo pasa a ser la única copia del día
+    if descomprimir_filas(datos)[1] != filas:
+        raise ValueError(f"La compresión del día {dia} no reproduce los datos originales")
+
+    temporal = ruta + ".tmp"
+    with open(temporal, "wb") as f:
+        f.write(datos)
+    os.replace(temporal, ruta)
+
+
+def _quitar_repetidas(archivadas, filas):
+    """
+    Quita de 'filas' las que ya están en el archivo (mismo datetime).
+    Pasa si una rotación anterior escribió el archivo pero no llegó a
+    reescribir el CSV vivo, o si se leyó el CSV justo antes de una rotación.
+    """
+    ya_archivados = {fila[0] for fila in archivadas if fila}
+    return [fila for fila in filas if fila[0] not in ya_archivados]
+
+
+def _agrupar_por_dia(filas, hoy):
+    """
+    Agrupa las filas por día. Una fila con datetime inválido se queda con
+    el día de la fila válida anterior (o de la siguiente, si está al
+    inicio); así nunca crea un "día" propio y se guarda con el modo csv.
+    """
+    por_dia = {}
+    pendientes = []
+    dia_previo = None
+    for fila in filas:
+        dia = dia_de_fila(fila)
+        if dia is None:
+            if dia_previo is None:
+                pendientes.append(fila)
+            else:
+                por_dia[dia_previo].append(fila)
+            continue
+        por_dia.setdefault(dia, []).extend(pendientes)
+        pendientes = []
+        por_dia[dia].append(fila)
+        dia_previo = dia
+
+    if pendientes:
+        por_dia.setdefault(hoy, []).extend(pendientes)
+    return por_dia
+
+
+def _leer_csv_vivo(csv_vivo):
+    with open(csv_vivo, "r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        cabecera = next(reader, None)
+        return cabecera, [fila for fila in reader if fila]
+
+
+def rotar_historico(csv_vivo=CSV_FILENAME, directorio=ARCHIVO_DIR, hoy=None, bloqueo=None):
+    """
+    Mueve al archivo comprimido todas las filas del CSV vivo que no son
+    del día 'hoy' (un archivo por día) y deja en el CSV solo las de hoy.
+    Retorna la lista de días archivados.
+
+    La compresión se hace sin bloquear. 'bloqueo' (p. ej. el lock del
+    logger) solo se toma al final para releer y reescribir el CSV vivo,
+    así que quien escribe en él puede seguir agregando filas mientras
+    tanto, siempre que abra el archivo en cada escritura.
+    """
+    if hoy is None:
+        hoy = datetime.now().date().isoformat()
+
+    if not os.path.exists(csv_vivo):
+        return []
+
+    cabecera, filas = _leer_csv_vivo(csv_vivo)
+    por_dia = _agrupar_por_dia(filas, hoy)
+
+    cerrados = sorted(dia for dia in por_dia if dia != hoy)
+    if not cerrados:
+        return []
+
+    for dia in cerrados:
+        filas = por_dia[dia]
+        # Si el día ya tenía archivo (p. ej. se reinició el logger o se
+        # interrumpió una rotación anterior), se une sin duplicar filas
+        if os.path.exists(ruta_archivo(dia, directorio)):
+            archivadas = leer_archivo(dia, directorio)
+            filas = archivadas + _quitar_repetidas(archivadas, filas)
+        _escribir_archivo(dia, filas, directorio)
+
+    movidas = {tuple(fila) for dia in cerrados for fila in por_dia[dia]}
+
+    # Reescribir el CSV vivo sin las filas archivadas. Se relee bajo el
+    # bloqueo para conservar lo que se agregó durante la compresión.
+    with bloqueo or nullcontext():
+        cabecera, filas = _leer_csv_vivo(csv_vivo)
+        temporal = csv_vivo + ".tmp"
+        with open(temporal, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(cabecera or CABECERA)
+            writer.writerows(fila for fila in filas if tuple(fila) not in movidas)
+        os.replace(temporal, csv_vivo)
+
+    return cerrados
+
+# ==========================================================
+# LECTURA CONTINUA (ARCHIVO + CSV VIVO)
+# ==========================================================
+
+def _normalizar_limite(valor, fin_de_dia):
+    """
+    Convierte un límite de rango a string ISO comparable con la columna
+    datetime. Una fecha sin hora cubre el día completo.
+    """
+    if valor is None:
+        return None
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    if isinstance(valor, date):
+        valor = valor.isoformat()
+
+    dt = datetime.fromisoformat(valor)
+    if len(valor) == 10 and fin_de_dia:
+        dt = dt.replace(hour=23, minute=59, second=59, microsecond=999999)
+    return dt.isoformat()
+
+
+def iterar_historico(desde=None, hasta=None, csv_vivo=CSV_FILENAME, directorio=ARCHIVO_DIR):
+    """
+    Recorre el histórico completo como una sola serie de tiempo:
+    primero los días archivados (en orden) y luego el CSV vivo.
+    Cada fila es una lista de strings igual a la del CSV original.
+
+    desde / hasta (opcionales, ambos inclusive) aceptan datetime, date o
+    string ISO: 'YYYY-MM-DD', 'YYYY-MM-DDTHH:MM[:SS[.ffffff]]'.
+    Una fecha sin hora en 'hasta' incluye todo ese día.
+
+    El CSV vivo se lee antes de listar el archivo: si el logger rota el día
+    en medio de la lectura, esas filas salen del archivo y se descartan
+    las repetidas del CSV, así no se pierden ni se duplican filas.
+    """
+    desde = _normalizar_limite(desde, fin_de_dia=False)
+    hasta = _normalizar_limite(hasta, fin_de_dia=True)
+
+    def en_rango(fila):
+        if desde is not None and fila[0] < desde:
+            return False
+        if hasta is not None and fila[0] > hasta:
+            return False
+        return True
+
+    vivas = []
+    if os.path.exists(csv_vivo):
+        with open(csv_vivo, "r", newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            vivas = [fila for fila in reader if fila]
+
+    dias = dias_archivados(directorio)
+
+    # Días que están a la vez en el CSV leído y en el archivo
+    dias_vivos = {fila[0][:10] for fila in vivas}
+    for dia in dias:
+        if dia in dias_vivos:
+            vivas = _quitar_repetidas(leer_archivo(dia, directorio), vivas)
+
+    for dia in dias:
+        # Saltar días completos fuera del rango sin descomprimirlos
+        if desde is not None and dia < desde[:10]:
+            continue
+        if hasta is not None and dia > hasta[:10]:
+            continue
+        for fila in leer_archivo(dia, directorio):
+            if en_rango(fila):
+                yield fila
+
+    for fila in vivas:
+        if en_rango(fila):
+            yield fila
+
+# ==========================================================
+# MAIN
+# ==========================================================
+
+def main():
+    print("\n" + "="*50)
+    print("     ROTAR HISTÓRICO A ARCHIVO COMPRIMIDO")
+    print("="*50 + "\n")
+
+    tam_antes = os.path.getsize(CSV_FILENAME) if os.path.exists(CSV_FILENAME) else 0
+    dias = rotar_historico()
+
+    if not dias:
+        print("No hay días cerrados para archivar")
+        return
+
+    tam_archivos = sum(os.path.getsize(ruta_archivo(dia)) for dia in dias)
+    tam_despues = os.path.getsize(CSV_FILENAME)
+    print(f" Días archivados: {', '.join(dias)}")
+    print(f" CSV vivo: {tam_antes} -> {tam_despues} bytes")
+    print(f" Archivo comprimido: {tam_archivos} bytes")
+
+
+if __name__ == "__main__":
+    main()
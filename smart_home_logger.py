@@ -3,11 +3,13 @@ import csv
 import re
 import time
 import json
+import os
 import subprocess
 import threading
 from datetime import datetime
 import paho.mqtt.client as mqtt
 import requests
+from historico_archivo import rotar_historico
 
 # ==========================================================
 # CONFIGURACIÓN GENERAL
@@ -26,6 +28,8 @@ INTERVALO_REGISTRO = 2.0
 VENTANA_SIZE = 90
 
 CSV_FILENAME = "smart_home_historico.csv"
+ARCHIVO_DIR = "historico"  # días cerrados del histórico, comprimidos
+REINTENTO_ROTACION = 60.0  # seg entre intentos si falla el archivado
 CSV_PROCESADO_FILENAME = "smart_home_procesado.csv"  # NUEVO: CSV con datos procesados de CUDA
 BUFFER_FILENAME = "ventana.json"
 
@@ -191,23 +195,58 @@ ventana_lock = threading.Lock()
 # HILO SERIAL: REGISTRO + VENTANA + CSV
 # ==========================================================
 
-def hilo_serial():
-    global ventana
+def escribir_fila_historico(fila):
+    # Se abre el CSV en cada escritura (cada 2 seg) para que la rotación
+    # pueda reescribirlo sin que el logger tenga un handle abierto
+    existe = os.path.exists(CSV_FILENAME)
 
-    ser = serial.Serial(PORT, BAUD, timeout=0.1)
+    with open(CSV_FILENAME, "a", newline="", encoding="utf-8") as csv_file:
+        writer = csv.writer(csv_file)
+        if not existe:
+            writer.writerow(["datetime", "sound_avg", "motion", "temp", "hum", "dist"])
+        writer.writerow(fila)
 
-    # Crear CSV si no existe
+# ==========================================================
+# HILO ARCHIVO: ROTACIÓN DIARIA DEL HISTÓRICO
+# ==========================================================
+
+# Día ya rotado, próximo reintento si falló y el hilo en curso
+estado_rotacion = {
+    "dia": None,
+    "proximo_intento": 0.0,
+    "hilo": None
+}
+
+def hilo_rotacion(hoy):
+    # Corre aparte: comprimir un día completo toma segundos y el hilo
+    # serial no debe dejar de leer. Archivar nunca detiene el registro.
     try:
-        open(CSV_FILENAME, "r")
-        existe = True
-    except:
-        existe = False
+        dias = rotar_historico(CSV_FILENAME, ARCHIVO_DIR, hoy, bloqueo=csv_lock)
+        if dias:
+            print(f"[ARCHIVO] Días archivados: {dias}")
+        estado_rotacion["dia"] = hoy
+    except Exception as e:
+        print(f"[ARCHIVO] Error archivando histórico, se reintenta en {REINTENTO_ROTACION} seg:", e)
+        estado_rotacion["proximo_intento"] = time.time() + REINTENTO_ROTACION
+
+def lanzar_rotacion(hoy):
+    hilo = estado_rotacion["hilo"]
+    if hilo is not None and hilo.is_alive():
+        return
+    if time.time() < estado_rotacion["proximo_intento"]:
+        return
+
+    hilo = threading.Thread(target=hilo_rotacion, args=(hoy,), daemon=True)
+    estado_rotacion["hilo"] = hilo
+    hilo.start()
+
+def hilo_serial():
+    global ventana
 
-    csv_file = open(CSV_FILENAME, "a", newline="", encoding="utf-8")
-    writer = csv.writer(csv_file)
+    ser = serial.Serial(PORT, BAUD, timeout=0.1)
 
-    if not existe:
-        writer.writerow(["datetime", "sound_avg", "motion", "temp", "hum", "dist"])
+    # Archivar días anteriores que hayan quedado en el CSV
+    lanzar_rotacion(datetime.now().date().isoformat())
 
     ultimo_registro = time.time()
 
@@ -280,8 +319,11 @@ def hilo_serial():
 
             # Guardar CSV
             with csv_lock:
-                writer.writerow([timestamp, sound_avg, motion_final, temp_final, hum_final, dist_final])
-            csv_file.flush()
+                escribir_fila_historico([timestamp, sound_avg, motion_final, temp_final, hum_final, dist_final])
+
+            # Cambio de día (o rotación pendiente): comprimir en segundo plano
+            if timestamp[:10] != estado_rotacion["dia"]:
+                lanzar_rotacion(timestamp[:10])
 
             # Guardar ventana
             registro = {